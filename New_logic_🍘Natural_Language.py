@@ -1,19 +1,23 @@
 import matplotlib
 # Disable the Matplotlib navigation toolbar
 matplotlib.rcParams['toolbar'] = 'None'
+# Let Agg merge nearly collinear segments of long waveforms more aggressively
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
 
 import os
 import sys
 import shutil
+import threading
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.io import wavfile
-import csv
 import sounddevice as sd
 from scipy import signal
 from matplotlib.collections import LineCollection
 from matplotlib.colors import ListedColormap, BoundaryNorm
 from matplotlib.widgets import Slider
+from matplotlib.transforms import Bbox
 
 ##############################################################################
 # Zero-Crossing Finder
@@ -24,14 +28,8 @@ def find_zero_crossings(data):
     We'll treat an exact zero crossing as a sign change if it goes from negative
     to zero to positive or vice versa.
     """
-    zero_positions = []
-    prev_sign = np.sign(data[0])
-    for i in range(1, len(data)):
-        current_sign = np.sign(data[i])
-        if current_sign != prev_sign:
-            zero_positions.append(i)
-            prev_sign = current_sign
-    return zero_positions
+    signs = np.sign(data)
+    return (np.flatnonzero(signs[1:] != signs[:-1]) + 1).tolist()
 
 ##############################################################################
 # 1) CUSTOM WAVE GENERATION
@@ -111,7 +109,7 @@ def generate_custom_wave():
     else:
         wave = np.sin(2*np.pi*freq*t)
 
-    wave /= np.max(np.abs(wave))
+    wave /= np.abs(wave).max()
 
     out_file = input("Enter name for custom wave file (e.g. my_custom_signal.wav): ").strip()
     if not out_file:
@@ -119,7 +117,7 @@ def generate_custom_wave():
     elif not out_file.lower().endswith(".wav"):
         out_file += ".wav"
 
-    wavfile.write(out_file, sample_rate, (wave * 32767).astype(np.int16))
+    wavfile.write(out_file, sample_rate, to_int16(wave))
 
     print(f"\nGenerated {wave_type} wave, freq={freq} Hz, sample_rate={sample_rate} Hz, "
           f"samples={total_samples}, duration={duration*1000:.2f} ms.")
@@ -129,9 +127,12 @@ def generate_custom_wave():
 ##############################################################################
 # 2) COLOR PICKER FUNCTIONS
 ##############################################################################
-def show_color_options(options, title):
-    print(f"\n{title}")
-    print(f"{'No.':<5} {'Name':<20} {'Hex Code':<10}  Sample")
+def format_color_options(options):
+    """
+    Build the menu rows (with an ANSI color swatch) and the list of hex
+    values for one palette. Done once at import; the pickers just print them.
+    """
+    rows = []
     for idx, (name, hex_code) in enumerate(options.items(), 1):
         try:
             r = int(hex_code[1:3], 16)
@@ -141,8 +142,16 @@ def show_color_options(options, title):
             r, g, b = (255, 255, 255)
         ansi_color = f"\033[38;2;{r};{g};{b}m"
         ansi_reset = "\033[0m"
-        print(f"{idx:<5} {name:<20} {hex_code:<10}  {ansi_color}██{ansi_reset}")
-    return list(options.values())
+        rows.append(f"{idx:<5} {name:<20} {hex_code:<10}  {ansi_color}██{ansi_reset}")
+    return rows, list(options.values())
+
+def show_color_options(menu, title):
+    rows, values = menu
+    print(f"\n{title}")
+    print(f"{'No.':<5} {'Name':<20} {'Hex Code':<10}  Sample")
+    for row in rows:
+        print(row)
+    return values
 
 def choose_color(options, prompt):
     while True:
@@ -156,88 +165,88 @@ def choose_color(options, prompt):
         else:
             print(f"Please enter a number between 1 and {len(options)}")
 
+BACKGROUND_MENU = format_color_options({
+    "Black": "#000000",
+    "Electric Blue": "#0000FF",
+    "Neon Purple": "#BF00FF",
+    "Bright Cyan": "#00FFFF",
+    "Vibrant Magenta": "#FF00FF",
+    "Neon Green": "#39FF14",
+    "Hot Pink": "#FF69B4",
+    "Neon Orange": "#FF4500",
+    "Bright Yellow": "#FFFF00",
+    "Electric Lime": "#CCFF00",
+    "Vivid Red": "#FF0000",
+    "Deep Sky Blue": "#00BFFF",
+    "Vivid Violet": "#9F00FF",
+    "Fluorescent Pink": "#FF1493",
+    "Laser Lemon": "#FFFF66",
+    "Screamin' Green": "#66FF66",
+    "Ultra Red": "#FF2400",
+    "Radical Red": "#FF355E",
+    "Vivid Orange": "#FFA500",
+    "Electric Indigo": "#6F00FF"
+})
+POSITIVE_MENU = format_color_options({
+    "Vibrant Green": "#00FF00",
+    "Neon Green": "#39FF14",
+    "Electric Lime": "#CCFF00",
+    "Bright Yellow": "#FFFF00",
+    "Vivid Cyan": "#00FFFF",
+    "Electric Blue": "#0000FF",
+    "Neon Purple": "#BF00FF",
+    "Hot Pink": "#FF69B4",
+    "Neon Orange": "#FF4500",
+    "Vivid Red": "#FF0000",
+    "Screamin' Green": "#66FF66",
+    "Laser Lemon": "#FFFF66",
+    "Fluorescent Magenta": "#FF00FF",
+    "Hyper Blue": "#1F51FF",
+    "Electric Teal": "#00FFEF",
+    "Vivid Turquoise": "#00CED1",
+    "Radical Red": "#FF355E",
+    "Ultra Violet": "#7F00FF",
+    "Neon Coral": "#FF6EC7",
+    "Luminous Lime": "#BFFF00"
+})
+NEGATIVE_MENU = format_color_options({
+    "Vibrant Green": "#00FF00",
+    "Neon Orange": "#FF4500",
+    "Hot Pink": "#FF69B4",
+    "Vivid Cyan": "#00FFFF",
+    "Electric Blue": "#0000FF",
+    "Neon Purple": "#BF00FF",
+    "Bright Yellow": "#FFFF00",
+    "Electric Lime": "#CCFF00",
+    "Vivid Red": "#FF0000",
+    "Deep Pink": "#FF1493",
+    "Screamin' Green": "#66FF66",
+    "Laser Lemon": "#FFFF66",
+    "Fluorescent Magenta": "#FF00FF",
+    "Hyper Blue": "#1F51FF",
+    "Electric Teal": "#00FFEF",
+    "Vivid Turquoise": "#00CED1",
+    "Radical Red": "#FF355E",
+    "Ultra Violet": "#7F00FF",
+    "Neon Coral": "#FF6EC7",
+    "Luminous Lime": "#BFFF00"
+})
+
 def run_color_picker(default_bg, default_pos, default_neg):
-    background_options = {
-        "Black": "#000000",
-        "Electric Blue": "#0000FF",
-        "Neon Purple": "#BF00FF",
-        "Bright Cyan": "#00FFFF",
-        "Vibrant Magenta": "#FF00FF",
-        "Neon Green": "#39FF14",
-        "Hot Pink": "#FF69B4",
-        "Neon Orange": "#FF4500",
-        "Bright Yellow": "#FFFF00",
-        "Electric Lime": "#CCFF00",
-        "Vivid Red": "#FF0000",
-        "Deep Sky Blue": "#00BFFF",
-        "Vivid Violet": "#9F00FF",
-        "Fluorescent Pink": "#FF1493",
-        "Laser Lemon": "#FFFF66",
-        "Screamin' Green": "#66FF66",
-        "Ultra Red": "#FF2400",
-        "Radical Red": "#FF355E",
-        "Vivid Orange": "#FFA500",
-        "Electric Indigo": "#6F00FF"
-    }
-    positive_options = {
-        "Vibrant Green": "#00FF00",
-        "Neon Green": "#39FF14",
-        "Electric Lime": "#CCFF00",
-        "Bright Yellow": "#FFFF00",
-        "Vivid Cyan": "#00FFFF",
-        "Electric Blue": "#0000FF",
-        "Neon Purple": "#BF00FF",
-        "Hot Pink": "#FF69B4",
-        "Neon Orange": "#FF4500",
-        "Vivid Red": "#FF0000",
-        "Screamin' Green": "#66FF66",
-        "Laser Lemon": "#FFFF66",
-        "Fluorescent Magenta": "#FF00FF",
-        "Hyper Blue": "#1F51FF",
-        "Electric Teal": "#00FFEF",
-        "Vivid Turquoise": "#00CED1",
-        "Radical Red": "#FF355E",
-        "Ultra Violet": "#7F00FF",
-        "Neon Coral": "#FF6EC7",
-        "Luminous Lime": "#BFFF00"
-    }
-    negative_options = {
-        "Vibrant Green": "#00FF00",
-        "Neon Orange": "#FF4500",
-        "Hot Pink": "#FF69B4",
-        "Vivid Cyan": "#00FFFF",
-        "Electric Blue": "#0000FF",
-        "Neon Purple": "#BF00FF",
-        "Bright Yellow": "#FFFF00",
-        "Electric Lime": "#CCFF00",
-        "Vivid Red": "#FF0000",
-        "Deep Pink": "#FF1493",
-        "Screamin' Green": "#66FF66",
-        "Laser Lemon": "#FFFF66",
-        "Fluorescent Magenta": "#FF00FF",
-        "Hyper Blue": "#1F51FF",
-        "Electric Teal": "#00FFEF",
-        "Vivid Turquoise": "#00CED1",
-        "Radical Red": "#FF355E",
-        "Ultra Violet": "#7F00FF",
-        "Neon Coral": "#FF6EC7",
-        "Luminous Lime": "#BFFF00"
-    }
-    
     use_custom = input("Use custom colors? (y/n): ").lower() == 'y'
     if not use_custom:
         return default_bg, default_pos, default_neg
 
     print("\nBackground Colors:")
-    bg_vals = show_color_options(background_options, "Pick a background color:")
+    bg_vals = show_color_options(BACKGROUND_MENU, "Pick a background color:")
     bg_pick = choose_color(bg_vals, "Enter number for background: ")
 
     print("\nPositive Envelope Colors:")
-    pos_vals = show_color_options(positive_options, "Pick a positive color:")
+    pos_vals = show_color_options(POSITIVE_MENU, "Pick a positive color:")
     pos_pick = choose_color(pos_vals, "Enter number for positive: ")
 
     print("\nNegative Envelope Colors:")
-    neg_vals = show_color_options(negative_options, "Pick a negative color:")
+    neg_vals = show_color_options(NEGATIVE_MENU, "Pick a negative color:")
     neg_pick = choose_color(neg_vals, "Enter number for negative: ")
 
     return bg_pick, pos_pick, neg_pick
@@ -298,6 +307,67 @@ def plot_strict_sign_colored_line(ax, xdata, ydata, neg_color, pos_color, linewi
     dummy_line = ax.plot([], [], color='none', label=label)[0]
     return lc, dummy_line
 
+def read_wav(path):
+    """
+    Read a .wav file memory-mapped where scipy supports it, so pages are
+    only read in as they are touched. scipy cannot map some containers
+    (e.g. 24-bit / 3-byte samples); those are read into memory instead.
+    """
+    try:
+        return wavfile.read(path, mmap=True)
+    except ValueError:
+        return wavfile.read(path)
+
+def style_export_axes(ax, xlim, ylim):
+    """
+    Legend, limits and aspect shared by the natural_lang and
+    wave_comparison exports; call it after the waves are plotted.
+    """
+    ax.legend(loc='upper right').get_frame().set_alpha(0.5)
+    ax.set(xlim=xlim, ylim=ylim, aspect='auto')
+
+def minmax_envelope(x, y, n_buckets):
+    """
+    Split y into n_buckets equal buckets and return each bucket's
+    starting x together with its min and max.
+    """
+    starts = np.linspace(0, len(y), n_buckets + 1).astype(np.intp)[:-1]
+    return x[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)
+
+def minmax_decimate(x, y, n_buckets):
+    """
+    Reduce (x, y) to one min/max pair per bucket for display.
+    The returned arrays interleave each bucket's min and max, so a plain
+    line through them traces the same outline as the full-resolution wave.
+    Short signals (up to 4 samples per bucket) are returned unchanged.
+    """
+    if len(y) <= 4 * n_buckets:
+        return x, y
+    bucket_x, ymin, ymax = minmax_envelope(x, y, n_buckets)
+    # Keep the last sample so the decimated line spans the full x range
+    xs = np.append(np.repeat(bucket_x, 2), x[-1])
+    ys = np.append(np.column_stack([ymin, ymax]).ravel(), y[-1])
+    return xs, ys
+
+def minmax_decimate_step(x, y, step):
+    """
+    minmax_decimate with buckets of `step` samples. When len(y) is a
+    multiple of step the bucket edges land exactly on multiples of step,
+    so slices that start and end on that grid decimate consistently.
+    """
+    return minmax_decimate(x, y, max(1, -(-len(y) // step)))
+
+def to_int16(wave, out=None):
+    """
+    Clip wave to [-1, 1] in place and scale it straight into an int16
+    buffer, with no float temporary in between. Pass `out` to reuse a buffer.
+    """
+    np.clip(wave, -1, 1, out=wave)
+    if out is None:
+        out = np.empty(len(wave), dtype=np.int16)
+    np.multiply(wave, 32767, out=out, casting='unsafe')
+    return out
+
 ##############################################################################
 # 4) EnvelopePlot Class (clamp user drawing to [-1,1])
 ##############################################################################
@@ -314,28 +384,66 @@ class EnvelopePlot:
         self.fig = self.ax.figure
         self.fig.patch.set_facecolor(self.canvas_bg_color)
 
-        self.sample_rate, data = wavfile.read(wav_file)
+        # Downmix/convert straight from the memory-mapped samples into one
+        # float32 buffer
+        self.sample_rate, data = read_wav(wav_file)
         if data.ndim > 1:
-            data = np.mean(data, axis=1)
+            self.audio_data = data.mean(axis=1, dtype=np.float32)
+        else:
+            self.audio_data = data.astype(np.float32)
         # Normalize to [-1,1]
-        self.audio_data = data.astype(float) / np.max(np.abs(data))
+        self.audio_data /= np.abs(self.audio_data).max()
         self.num_points = len(self.audio_data)
-        self.max_amp = np.max(np.abs(self.audio_data))
-
-        time_axis = np.arange(self.num_points)/self.sample_rate
-        # faint_line => original wave (light)
-        self.faint_line, = self.ax.plot(
-            time_axis,
-            self.audio_data,
-            color=self.canvas_pos_color,
-            alpha=0.15, lw=1
-        )
+        # Negative samples take drawing_neg; built once, not on every preview
+        self._neg_mask = self.audio_data < 0
+        # Peak-normalized, so the max amplitude is 1.0 by construction
+        self.max_amp = 1.0
+
+        self._sample_idx = np.arange(self.num_points, dtype=np.int32)
+        self.x_axis = self._sample_idx/self.sample_rate
+        # faint_line => original wave (light). Long files get it as a min/max
+        # band at screen resolution instead of stroking every sample.
+        px_width = int(self.fig.get_figwidth() * self.fig.dpi)
+        if self.num_points > 2 * px_width:
+            self.faint_line = self.ax.fill_between(
+                *minmax_envelope(self.x_axis, self.audio_data, px_width),
+                color=self.canvas_pos_color,
+                alpha=0.15, lw=1,
+                rasterized=True
+            )
+        else:
+            self.faint_line, = self.ax.plot(
+                self.x_axis,
+                self.audio_data,
+                color=self.canvas_pos_color,
+                alpha=0.15, lw=1,
+                rasterized=True
+            )
 
-        self.drawing_pos = np.zeros(self.num_points)
-        self.drawing_neg = np.zeros(self.num_points)
+        # Reused for every int16 conversion (previews and the final export)
+        self._int16_out = np.empty(self.num_points, dtype=np.int16)
+        # Float scratch for previews and int16 conversions, so pressing 'p'
+        # allocates nothing and the export never clips its input in place
+        self._f32_scratch = np.empty(self.num_points, dtype=np.float32)
+        # Previews go through one persistent output stream (opened on the
+        # first 'p'); its callback reads _play_buf from _play_pos onwards.
+        # The callback runs on the audio thread, so both fields are only
+        # read or written while holding _play_lock.
+        self._stream = None
+        self._play_lock = threading.Lock()
+        self._play_buf = None
+        self._play_pos = 0
+        # float32 is far finer than a mouse pixel and halves the bytes moved
+        # by every redraw, export and undo snapshot
+        self.drawing_pos = np.zeros(self.num_points, dtype=np.float32)
+        self.drawing_neg = np.zeros(self.num_points, dtype=np.float32)
 
         self.line_pos, = self.ax.plot([], [], color=self.canvas_pos_color, lw=2, label='Positive')
         self.line_neg, = self.ax.plot([], [], color=self.canvas_neg_color, lw=2, label='Negative')
+        # Animated lines are left out of full canvas draws, so the background
+        # cached on each draw_event never holds stale envelope pixels
+        self.line_pos.set_animated(True)
+        self.line_neg.set_animated(True)
 
         self.final_line = None
         self.comparison_line_orig = None
@@ -357,13 +465,29 @@ class EnvelopePlot:
                      verticalalignment='top')
 
         self.ax.set_aspect('auto')
+        # Limits are pinned above, so never rescan the line data for autoscaling
+        self.ax.set_autoscale_on(False)
 
         self.is_drawing = False
         self.prev_idx = None
-        self.last_state_pos = None
-        self.last_state_neg = None
+        # One entry per stroke: the (envelope, start_idx, old values) slices
+        # it overwrote, so undo cost follows the edited range, not the file length
+        self._undo_stack = []
         self.background = None
+        self.blit_bbox = None
         self.offset = 0.0
+        # Smallest/largest sample index drawn so far (None until the first stroke)
+        self._draw_min = None
+        self._draw_max = None
+
+        # Motion events only edit the arrays; the canvas is blitted at most
+        # once per frame (~60 Hz) from this timer while a stroke is active.
+        self._pending_range = None
+        self._redraw_timer = self.fig.canvas.new_timer(interval=16)
+        self._redraw_timer.add_callback(self._flush_draw)
+        # Envelope lines are drawn at screen resolution (samples per pixel)
+        self._update_lod_step()
+        self._cid_draw = self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
     def on_mouse_press(self, event):
         if event.inaxes != self.ax:
@@ -371,9 +495,9 @@ class EnvelopePlot:
         self.is_drawing = True
         if event.xdata is not None:
             self.prev_idx = int(event.xdata * self.sample_rate)
-        self.last_state_pos = self.drawing_pos.copy()
-        self.last_state_neg = self.drawing_neg.copy()
+        self._undo_stack.append([])
         self.update_drawing(event)
+        self._redraw_timer.start()
 
     def on_mouse_move(self, event):
         if self.is_drawing and event.inaxes == self.ax:
@@ -381,6 +505,46 @@ class EnvelopePlot:
 
     def on_mouse_release(self, event):
         self.is_drawing = False
+        self._redraw_timer.stop()
+        self._flush_draw()
+        self.set_line_data()
+
+    def on_resize(self, event):
+        # The cached blit background no longer matches the canvas; the redraw
+        # that follows caches a new one in on_draw. The axes limits are
+        # pinned, so there is nothing else to recompute.
+        self.background = None
+        self.blit_bbox = None
+        self._update_lod_step()
+
+    def _update_lod_step(self):
+        self._lod_step = max(1, self.num_points // max(1, int(self.ax.bbox.width)))
+
+    def _line_data(self, envelope, lo, hi):
+        # Min/max decimated line data for samples lo..hi. The slice starts
+        # and ends on the bucket grid (or at the last sample), so a stroke
+        # only changes the pixels it touches.
+        step = self._lod_step
+        lo -= lo % step
+        hi = min(hi + (-(hi + 1) % step), self.num_points - 1)
+        return minmax_decimate_step(self.x_axis[lo:hi+1], envelope[lo:hi+1] + self.offset, step)
+
+    def on_draw(self, event):
+        # Matplotlib just finished a full draw without the envelope lines:
+        # cache it as the blit background, then paint the lines on top.
+        self.background = event.canvas.copy_from_bbox(self.ax.bbox)
+        self.blit_bbox = self.ax.bbox.frozen()
+        self.ax.draw_artist(self.line_pos)
+        self.ax.draw_artist(self.line_neg)
+
+    def stop_blitting(self):
+        # Drawing is over; hand the lines back to normal rendering so that
+        # savefig includes them.
+        self.fig.canvas.mpl_disconnect(self._cid_draw)
+        self.line_pos.set_animated(False)
+        self.line_neg.set_animated(False)
+        self.background = None
+        self.blit_bbox = None
 
     def update_drawing(self, event):
         if event.xdata is None or event.ydata is None:
@@ -404,66 +568,175 @@ class EnvelopePlot:
             else:
                 start_val = envelope[self.prev_idx]
                 end_val = amp
-            envelope[start_idx:end_idx+1] = np.linspace(
-                start_val, end_val,
-                end_idx - start_idx + 1
-            )
+            self._record_undo(envelope, start_idx, end_idx)
+            # Write the linear ramp straight into the envelope slice
+            # (same values as np.linspace, without its temporary array)
+            k = end_idx - start_idx + 1
+            ramp = envelope[start_idx:end_idx+1]
+            np.multiply(self._sample_idx[:k], (end_val - start_val) / (k - 1), out=ramp)
+            ramp += start_val
         else:
+            start_idx = end_idx = idx
+            self._record_undo(envelope, idx, idx)
             envelope[idx] = amp
         self.prev_idx = idx
 
-        time_axis = np.arange(self.num_points)/self.sample_rate
-        self.line_pos.set_data(time_axis, self.drawing_pos + self.offset)
-        self.line_neg.set_data(time_axis, self.drawing_neg + self.offset)
+        # Track the range drawn so far; only that slice is handed to the
+        # lines, and the full-length data is restored on mouse release.
+        dirty_lo, dirty_hi = start_idx, end_idx
+        if self._draw_min is None:
+            self._draw_min, self._draw_max = start_idx, end_idx
+        else:
+            # Growing the drawn range also draws the zero stretch that joins
+            # it to the new samples, so that stretch is dirty as well
+            if start_idx < self._draw_min:
+                dirty_hi = max(dirty_hi, self._draw_min)
+            if end_idx > self._draw_max:
+                dirty_lo = min(dirty_lo, self._draw_max)
+            self._draw_min = min(self._draw_min, start_idx)
+            self._draw_max = max(self._draw_max, end_idx)
+
+        if self._pending_range is not None:
+            dirty_lo = min(dirty_lo, self._pending_range[0])
+            dirty_hi = max(dirty_hi, self._pending_range[1])
+        self._pending_range = (dirty_lo, dirty_hi)
+
+    def _flush_draw(self):
+        if self._pending_range is None:
+            return
+        dirty_lo, dirty_hi = self._pending_range
+        self._pending_range = None
+
+        self.line_pos.set_data(*self._line_data(self.drawing_pos, self._draw_min, self._draw_max))
+        self.line_neg.set_data(*self._line_data(self.drawing_neg, self._draw_min, self._draw_max))
 
+        canvas = self.ax.figure.canvas
         if self.background is None:
-            self.background = self.ax.figure.canvas.copy_from_bbox(self.ax.bbox)
-        else:
-            self.ax.figure.canvas.restore_region(self.background)
+            # No clean background yet (e.g. just resized); the full draw
+            # refreshes it in on_draw and paints the lines there.
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)
         self.ax.draw_artist(self.line_pos)
         self.ax.draw_artist(self.line_neg)
-        self.ax.figure.canvas.blit(self.ax.bbox)
+
+        # Only push the pixel columns that changed; pad for the line width
+        # and the joins to the neighbouring samples.
+        (x0, _), (x1, _) = self.ax.transData.transform(
+            [(self.x_axis[dirty_lo], 0), (self.x_axis[dirty_hi], 0)])
+        pad = 4
+        dirty = Bbox.from_extents(max(x0 - pad, self.blit_bbox.x0), self.blit_bbox.y0,
+                                  min(x1 + pad, self.blit_bbox.x1), self.blit_bbox.y1)
+        canvas.blit(dirty)
+
+    def _record_undo(self, envelope, start_idx, end_idx):
+        if self._undo_stack:
+            self._undo_stack[-1].append((envelope, start_idx, envelope[start_idx:end_idx+1].copy()))
 
     def undo_envelope(self):
-        if self.last_state_pos is not None and self.last_state_neg is not None:
-            self.drawing_pos = self.last_state_pos.copy()
-            self.drawing_neg = self.last_state_neg.copy()
+        # Strokes that never touched the envelope have nothing to undo
+        while self._undo_stack:
+            stroke = self._undo_stack.pop()
+            if not stroke:
+                continue
+            for envelope, start_idx, saved in reversed(stroke):
+                end_idx = start_idx + len(saved) - 1
+                envelope[start_idx:end_idx+1] = saved
+                if self._draw_min is None:
+                    self._draw_min, self._draw_max = start_idx, end_idx
+                else:
+                    self._draw_min = min(self._draw_min, start_idx)
+                    self._draw_max = max(self._draw_max, end_idx)
             self.redraw_lines()
+            return
 
     def reset_envelope(self):
+        # Record the drawn range as one stroke so a reset can be undone too
+        if self._draw_min is not None:
+            self._undo_stack.append([])
+            self._record_undo(self.drawing_pos, self._draw_min, self._draw_max)
+            self._record_undo(self.drawing_neg, self._draw_min, self._draw_max)
         self.drawing_pos[:] = 0
         self.drawing_neg[:] = 0
+        self._draw_min = None
+        self._draw_max = None
+        self._pending_range = None
         self.redraw_lines()
 
+    def set_line_data(self):
+        last = self.num_points - 1
+        self.line_pos.set_data(*self._line_data(self.drawing_pos, 0, last))
+        self.line_neg.set_data(*self._line_data(self.drawing_neg, 0, last))
+
     def redraw_lines(self):
-        time_axis = np.arange(self.num_points)/self.sample_rate
-        self.line_pos.set_data(time_axis, self.drawing_pos + self.offset)
-        self.line_neg.set_data(time_axis, self.drawing_neg + self.offset)
+        self.set_line_data()
         self.ax.figure.canvas.draw_idle()
 
     def preview_envelope(self):
-        adjusted = self.get_drawn_wave()
-        audio_int16 = (adjusted * 32767).astype(np.int16)
-        sd.play(audio_int16, self.sample_rate)
-        sd.wait()
-
-    def get_drawn_wave(self):
+        # Silence the stream while the shared buffer is being refilled
+        with self._play_lock:
+            self._play_buf = None
+        adjusted = self.get_drawn_wave(out=self._f32_scratch)
+        audio_int16 = self.as_int16(adjusted)
+        if self._stream is None:
+            self._stream = sd.OutputStream(samplerate=self.sample_rate, channels=1,
+                                           dtype='int16', blocksize=1024,
+                                           callback=self._audio_callback)
+            self._stream.start()
+        # Playback runs in the stream's callback; the canvas stays responsive
+        with self._play_lock:
+            self._play_pos = 0
+            self._play_buf = audio_int16
+
+    def _audio_callback(self, outdata, frames, time, status):
+        with self._play_lock:
+            buf = self._play_buf
+            if buf is None:
+                outdata.fill(0)
+                return
+            pos = self._play_pos
+            block = buf[pos:pos + frames]
+            outdata[:len(block), 0] = block
+            outdata[len(block):] = 0
+            self._play_pos = pos + frames
+            if self._play_pos >= len(buf):
+                self._play_buf = None
+
+    def close_audio(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        with self._play_lock:
+            self._play_buf = None
+
+    def get_drawn_wave(self, out=None):
         """
         Return the raw 'drawn' wave, i.e. if sample>0 => use drawing_pos,
         if sample<0 => use drawing_neg. Then clamp again just in case.
+        Pass `out` to fill an existing buffer instead of allocating one.
         """
-        adjusted = np.copy(self.audio_data)
-        for i in range(len(adjusted)):
-            if adjusted[i] > 0:
-                val = self.drawing_pos[i] + self.offset
-            elif adjusted[i] < 0:
-                val = self.drawing_neg[i] + self.offset
-            else:
-                val = self.drawing_pos[i] + self.offset
-            # clamp to [-1,1]
-            adjusted[i] = max(min(val, 1.0), -1.0)
+        if out is None:
+            out = np.empty(self.num_points, dtype=self.drawing_pos.dtype)
+        adjusted = out
+        # Samples at exactly 0 take the positive envelope
+        np.copyto(adjusted, self.drawing_pos)
+        np.copyto(adjusted, self.drawing_neg, where=self._neg_mask)
+        adjusted += self.offset
+        # clamp to [-1,1]
+        np.clip(adjusted, -1.0, 1.0, out=adjusted)
         return adjusted
 
+    def as_int16(self, wave):
+        """
+        Clip wave to [-1, 1] and scale it into the reused int16 buffer.
+        The clip goes through the float scratch buffer, so `wave` itself
+        is left as it was. The result is overwritten by the next call.
+        """
+        clipped = np.clip(wave, -1, 1, out=self._f32_scratch)
+        np.multiply(clipped, 32767, out=self._int16_out, casting='unsafe')
+        return self._int16_out
+
     def reapply_colors(self, bg_color, pos_color, neg_color,
                        faint_alpha=0.15, final_wave_color="#00FF00",
                        final_wave_alpha=0.4, orig_alpha=0.6, mod_alpha=0.8):
@@ -490,17 +763,15 @@ class EnvelopePlot:
 ##############################################################################
 # Additional Helper: Write CSV
 ##############################################################################
-def write_csv(filename, headers, data_rows):
+def write_csv(filename, headers, columns, fmt):
     """
     Generic CSV writer.
     headers: list of column names
-    data_rows: list of lists, each sublist is one row
+    columns: list of equal-length 1-D arrays, one per column
+    fmt: list of printf-style formats, one per column
     """
-    with open(filename, "w", newline="") as f_:
-        writer = csv.writer(f_)
-        writer.writerow(headers)
-        for row in data_rows:
-            writer.writerow(row)
+    np.savetxt(filename, np.column_stack(columns), delimiter=",",
+               header=",".join(headers), fmt=fmt, comments="")
 
 ##############################################################################
 # Modified Wave Creation (Using a SCALING approach)
@@ -516,36 +787,24 @@ def create_modified_wave(original_data, drawn_data, zero_positions):
     # For safety, clamp drawn_data to [-1,1] in case user drew huge values
     drawn_data = np.clip(drawn_data, -1.0, 1.0)
 
-    all_positions = [0] + zero_positions + [len(original_data)]
-    new_data = np.copy(original_data)
+    # Chunk boundaries: every chunk starts at 0 or a zero crossing
+    starts = np.concatenate(([0], zero_positions)).astype(np.intp)
+    lengths = np.diff(np.append(starts, len(original_data)))
 
-    for i in range(len(all_positions) - 1):
-        start_idx = all_positions[i]
-        end_idx   = all_positions[i+1]  # non-inclusive boundary
+    # Steps 2 and 3: per-chunk peaks, all chunks in one reduction each
+    peak_val = np.maximum.reduceat(np.abs(original_data), starts)
+    drawn_peak = np.maximum.reduceat(np.abs(drawn_data), starts)
 
-        chunk_orig = original_data[start_idx:end_idx]
-        chunk_drawn = drawn_data[start_idx:end_idx]
-
-        if len(chunk_orig) == 0:
-            continue
-        # Step 2: largest absolute peak in the original chunk
-        peak_val = np.max(np.abs(chunk_orig))
+    # Step 4: scale factor (chunks where the user drew near 0 are set to 0)
+    scale_factor = np.zeros_like(peak_val)
+    drawn_ok = drawn_peak >= 1e-12
+    scale_factor[drawn_ok] = peak_val[drawn_ok] / drawn_peak[drawn_ok]
 
-        # Step 3: maximum absolute amplitude in the drawn chunk
-        drawn_peak = np.max(np.abs(chunk_drawn)) if len(chunk_drawn) else 0.0
-
-        # Step 4: scale factor
-        if drawn_peak < 1e-12:
-            # If user drew near 0, we can set the entire chunk to 0
-            # or keep it unchanged. Let's assume we set it to 0:
-            shifted_chunk = np.zeros_like(chunk_orig)
-        else:
-            scale_factor = peak_val / drawn_peak
-            shifted_chunk = chunk_orig * scale_factor
-
-        # Step 5: clip
-        shifted_chunk = np.clip(shifted_chunk, -1.0, 1.0)
-        new_data[start_idx:end_idx] = shifted_chunk
+    # Step 5: scale each chunk, then clip. The expanded per-sample scales
+    # are the only full-length allocation; everything else happens in place.
+    new_data = np.repeat(scale_factor, lengths)
+    np.multiply(new_data, original_data, out=new_data)
+    np.clip(new_data, -1.0, 1.0, out=new_data)
 
     return new_data
 
@@ -573,30 +832,32 @@ def process_single_file():
     os.makedirs(new_folder, exist_ok=True)
     print(f"Created folder: {new_folder}")
 
-    shutil.copy(wf, new_folder)
+    # copyfile skips the permission copy and takes the kernel's zero-copy path
+    shutil.copyfile(wf, os.path.join(new_folder, os.path.basename(wf)))
     print(f"Copied {wf} to {new_folder}")
 
     # ================== Step 1: Save original.csv ====================
-    sr, raw_data = wavfile.read(wf)
+    sr, raw_data = read_wav(wf)
     if raw_data.ndim > 1:
-        raw_data = np.mean(raw_data, axis=1)
-    raw_data = raw_data.astype(float)
-    max_val = np.max(np.abs(raw_data))
+        raw_data = raw_data.mean(axis=1, dtype=np.float32)
+    else:
+        raw_data = raw_data.astype(np.float32)
+    max_val = np.abs(raw_data).max()
     if max_val < 1e-12:
         max_val = 1.0
     # Normalize
-    raw_data_norm = raw_data / max_val
+    raw_data /= max_val
+    raw_data_norm = raw_data
 
     original_csv_path = os.path.join(new_folder, "original.csv")
-    orig_rows = [[i, sample] for i, sample in enumerate(raw_data_norm)]
-    write_csv(original_csv_path, ["Index", "Amplitude"], orig_rows)
+    write_csv(original_csv_path, ["Index", "Amplitude"],
+              [np.arange(len(raw_data_norm)), raw_data_norm], ["%d", "%.8g"])
     print(f"original.csv saved to {original_csv_path}")
 
     # ================== Step 2: wave_position.csv ====================
     zc_indices = find_zero_crossings(raw_data_norm)
     wavepos_csv_path = os.path.join(new_folder, "wave_position.csv")
-    wp_rows = [[idx] for idx in zc_indices]
-    write_csv(wavepos_csv_path, ["ZeroCrossIndex"], wp_rows)
+    write_csv(wavepos_csv_path, ["ZeroCrossIndex"], [zc_indices], ["%d"])
     print(f"wave_position.csv saved to {wavepos_csv_path}")
 
     # =========== Drawing Canvas =============
@@ -634,6 +895,8 @@ def process_single_file():
     def on_release(event):
         if event.inaxes == ep.ax:
             ep.on_mouse_release(event)
+    def on_resize(event):
+        ep.on_resize(event)
     def on_key(event):
         if not event.key:
             return
@@ -654,6 +917,7 @@ def process_single_file():
     cid_move    = fig.canvas.mpl_connect('motion_notify_event', on_move)
     cid_release = fig.canvas.mpl_connect('button_release_event', on_release)
     cid_key     = fig.canvas.mpl_connect('key_press_event', on_key)
+    cid_resize  = fig.canvas.mpl_connect('resize_event', on_resize)
 
     plt.show(block=False)
     print("Drawing phase active. Press Enter when done.")
@@ -663,12 +927,15 @@ def process_single_file():
     fig.canvas.mpl_disconnect(cid_move)
     fig.canvas.mpl_disconnect(cid_release)
     fig.canvas.mpl_disconnect(cid_key)
+    fig.canvas.mpl_disconnect(cid_resize)
+    ep.stop_blitting()
+    ep.close_audio()
 
     # ================== Step 3: Save drawn.csv ====================
     drawn_wave = ep.get_drawn_wave()  # direct envelope approach (already clamped)
     drawn_csv_path = os.path.join(new_folder, "drawn.csv")
-    drows = [[i, amp] for i, amp in enumerate(drawn_wave)]
-    write_csv(drawn_csv_path, ["Index", "DrawnAmplitude"], drows)
+    write_csv(drawn_csv_path, ["Index", "DrawnAmplitude"],
+              [np.arange(len(drawn_wave)), drawn_wave], ["%d", "%.8g"])
     print(f"drawn.csv saved to {drawn_csv_path}")
 
     # =========== final_drawing =============
@@ -686,7 +953,7 @@ def process_single_file():
     print(f"DEBUG: mod_wave min={mod_wave.min():.3f}, max={mod_wave.max():.3f}")
 
     # Convert back to int16
-    mod_wave_int16 = (mod_wave * 32767).astype(np.int16)
+    mod_wave_int16 = ep.as_int16(mod_wave)
     wav_path = os.path.join(new_folder, f"future_{os.path.basename(ep.wav_file)}")
     wavfile.write(wav_path, ep.sample_rate, mod_wave_int16)
     print(f"Modified audio saved to {wav_path}")
@@ -710,25 +977,26 @@ def process_single_file():
     ep.reapply_colors(n_bg, n_pos, n_neg)
 
     ax.cla()
-    ax.set_facecolor(n_bg)
-    ax.set_xlabel("Time (s)")
-    ax.set_ylabel("Amplitude")
+    ax.set(facecolor=n_bg, xlabel="Time (s)", ylabel="Amplitude")
 
-    time_axis = np.arange(len(mod_wave)) / sr
-    # We'll fix the y-limits to [-1.1, 1.1] so it won't auto-scale:
-    ax.set_xlim(0, len(mod_wave)/sr)
-    ax.set_ylim(-1.1, 1.1)
+    # EnvelopePlot's x axis is already in seconds
+    time_axis = ep.x_axis
+    # Export plots only need one min/max pair per output pixel column;
+    # natural_lang and wave_comparison share the decimated modified wave
+    px_width = int(fig.get_figwidth() * fig.dpi)
+    mod_dec = minmax_decimate(time_axis, mod_wave, px_width)
+    # Fixed limits so neither export auto-scales
+    xlim, ylim = (0, len(mod_wave)/sr), (-1.1, 1.1)
 
     lc, dummy_line = plot_strict_sign_colored_line(
-        ax, time_axis, mod_wave,
+        ax, *mod_dec,
         neg_color=n_neg,
         pos_color=n_pos,
         linewidth=2,
         label="Modified Wave"
     )
 
-    ax.legend(loc='upper right').get_frame().set_alpha(0.5)
-    ax.set_aspect('auto')
+    style_export_axes(ax, xlim, ylim)
     nat_path = os.path.join(new_folder, "natural_lang.png")
     fig.savefig(nat_path)
     print(f"natural_lang.png saved to {nat_path}")
@@ -739,17 +1007,11 @@ def process_single_file():
     c_bg, c_pos, c_neg = run_color_picker("#000000", "#00FF00", "#FF0000")
     ep.reapply_colors(c_bg, c_pos, c_neg)
 
-    ax.set_facecolor(c_bg)
-    ax.set_xlabel("Time (s)")
-    ax.set_ylabel("Amplitude")
-
-    ax.plot(time_axis, raw_data_norm, lw=2, color=c_neg, label='Original Wave')
-    ax.plot(time_axis, mod_wave, lw=2, color=c_pos, label='Modified Wave')
-    ax.legend(loc='upper right').get_frame().set_alpha(0.5)
+    ax.set(facecolor=c_bg, xlabel="Time (s)", ylabel="Amplitude")
 
-    ax.set_xlim(0, len(mod_wave)/sr)
-    ax.set_ylim(-1.1, 1.1)
-    ax.set_aspect('auto')
+    ax.plot(*minmax_decimate(time_axis, raw_data_norm, px_width), lw=2, color=c_neg, label='Original Wave')
+    ax.plot(*mod_dec, lw=2, color=c_pos, label='Modified Wave')
+    style_export_axes(ax, xlim, ylim)
 
     cmp_path = os.path.join(new_folder, "wave_comparison.png")
     fig.savefig(cmp_path)
@@ -2,6 +2,29 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.io import wavfile
 
+def minmax_envelope(x, y, n_buckets):
+    """
+    Split y into n_buckets equal buckets and return each bucket's
+    starting x together with its min and max.
+    """
+    starts = np.linspace(0, len(y), n_buckets + 1).astype(np.intp)[:-1]
+    return x[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)
+
+def minmax_decimate(x, y, n_buckets):
+    """
+    Reduce (x, y) to one min/max pair per bucket for display.
+    The returned arrays interleave each bucket's min and max, so a plain
+    line through them traces the same outline as the full-resolution wave.
+    Short signals (up to 4 samples per bucket) are returned unchanged.
+    """
+    if len(y) <= 4 * n_buckets:
+        return x, y
+    bucket_x, ymin, ymax = minmax_envelope(x, y, n_buckets)
+    # Keep the last sample so the decimated line spans the full x range
+    xs = np.append(np.repeat(bucket_x, 2), x[-1])
+    ys = np.append(np.column_stack([ymin, ymax]).ravel(), y[-1])
+    return xs, ys
+
 # Read .wav file
 sample_rate, data = wavfile.read('input.wav')
 
@@ -26,11 +49,14 @@ modified_data[modified_data < 0] = average_negative
 wavfile.write('flattened.wav', sample_rate, modified_data.astype(np.int16))
 
 # Plot original and modified signals
-plt.figure(figsize=(12, 6))
+fig = plt.figure(figsize=(12, 6))
+# One min/max pair per horizontal pixel is all the plots can show
+px_width = int(fig.get_figwidth() * fig.dpi)
+sample_idx = np.arange(len(data))
 
 # Plot original signal
 plt.subplot(2, 1, 1)
-plt.plot(data, label='Original Signal')
+plt.plot(*minmax_decimate(sample_idx, data, px_width), label='Original Signal')
 plt.title('Original Signal')
 plt.xlabel('Sample')
 plt.ylabel('Amplitude')
@@ -38,7 +64,7 @@ plt.legend()
 
 # Plot modified signal
 plt.subplot(2, 1, 2)
-plt.plot(modified_data, label='Modified Signal')
+plt.plot(*minmax_decimate(sample_idx, modified_data, px_width), label='Modified Signal')
 plt.title('Modified Signal')
 plt.xlabel('Sample')
 plt.ylabel('Amplitude')
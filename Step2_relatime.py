@@ -6,7 +6,12 @@ class InteractiveWaveform:
     def __init__(self, audio_file):
         # Read the audio file
         self.sample_rate, self.audio_data = wavfile.read(audio_file)
-        self.audio_data = self.audio_data / np.max(np.abs(self.audio_data))
+        # Downmix/convert into one float32 buffer, then normalize it in place
+        if self.audio_data.ndim > 1:
+            self.audio_data = self.audio_data.mean(axis=1, dtype=np.float32)
+        else:
+            self.audio_data = self.audio_data.astype(np.float32)
+        self.audio_data /= np.abs(self.audio_data).max()
         
         # Set up the plot
         self.fig, self.ax = plt.subplots()
@@ -39,7 +44,15 @@ class InteractiveWaveform:
             self.fig.canvas.draw()
 
     def save_audio(self, output_file):
-        wavfile.write(output_file, self.sample_rate, (self.audio_data * 32767).astype(np.int16))
+        wavfile.write(output_file, self.sample_rate, self._to_pcm16(self.audio_data))
+
+    def _to_pcm16(self, x):
+        # Clip a copy (so the edited samples stay as they are) to saturate
+        # instead of wrapping, then scale and cast it into int16 in one pass
+        clipped = np.clip(x, -1, 1)
+        pcm16 = np.empty(len(clipped), dtype=np.int16)
+        np.multiply(clipped, 32767, out=pcm16, casting='unsafe')
+        return pcm16
 
 # Example usage
 interactive_waveform = InteractiveWaveform('input.wav')
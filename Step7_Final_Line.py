@@ -1,23 +1,90 @@
 import os
 import shutil
+import time
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from scipy.io import wavfile
-import csv
+from concurrent.futures import ThreadPoolExecutor
+
+def _envelope_lc(y, width_px, scale=1.0, **kwargs):
+    """
+    Bin y into width_px buckets and return a LineCollection with one vertical
+    min->max segment per bucket, so the vertex count follows the display width
+    instead of the number of samples. The segments are multiplied by scale.
+    """
+    edges = np.linspace(0, len(y), width_px + 1).astype(np.int64)
+    starts = edges[:-1]
+    ymin = np.minimum.reduceat(y, starts)
+    ymax = np.maximum.reduceat(y, starts)
+    # Reach into the next bucket's first sample so adjacent segments join up
+    ymin[:-1] = np.minimum(ymin[:-1], y[starts[1:]])
+    ymax[:-1] = np.maximum(ymax[:-1], y[starts[1:]])
+    x = (starts + edges[1:] - 1) / 2
+    ymin = ymin * scale
+    ymax = ymax * scale
+    segments = np.stack([np.column_stack([x, ymin]), np.column_stack([x, ymax])], axis=1)
+    return LineCollection(segments, **kwargs)
+
+def _to_int16(wave, out=None):
+    """
+    Clip wave to [-1, 1] in place and scale it straight into an int16
+    buffer, with no float temporary in between. Pass `out` to reuse a buffer.
+    """
+    np.clip(wave, -1, 1, out=wave)
+    if out is None:
+        out = np.empty(len(wave), dtype=np.int16)
+    np.multiply(wave, 32767, out=out, casting='unsafe')
+    return out
+
+def _fill_segment(env, x, prev_idx, idx, value):
+    """
+    Write a straight line from env[prev_idx] to value at idx into env, in
+    place. Same values as np.linspace, but scaled straight from the cached
+    x axis instead of allocating a temporary per motion event.
+    """
+    start_val = env[prev_idx]
+    start, end = min(prev_idx, idx), max(prev_idx, idx)
+    n = end - start + 1
+    if n > 1:
+        seg = env[start:end + 1]
+        if idx < prev_idx:
+            # Dragging left: the ramp runs from the new point up to prev_idx
+            start_val, value = value, start_val
+        np.multiply(x[:n], (value - start_val) / (n - 1), out=seg)
+        seg += start_val
+
+def _blend(pos_mask, zero_mask, pos, neg, out):
+    """
+    out = pos where pos_mask, 0 where zero_mask, neg everywhere else,
+    written straight into out with masked copies (no temporaries).
+    """
+    np.copyto(out, neg)
+    np.copyto(out, pos, where=pos_mask)
+    np.copyto(out, 0.0, where=zero_mask)
+
+def _read_wav(path):
+    """
+    Read a .wav file memory-mapped where scipy supports it; containers it
+    cannot map (e.g. 24-bit / 3-byte samples) are read into memory instead.
+    """
+    try:
+        return wavfile.read(path, mmap=True)
+    except ValueError:
+        return wavfile.read(path)
 
 class IntegratedWaveformTool:
     def __init__(self, audio_file):
         self.audio_file = audio_file
-        self.sample_rate, self.audio_data = wavfile.read(audio_file)
 
-        # Convert stereo to mono if needed
-        if len(self.audio_data.shape) == 2:  # If stereo (2D array)
-            self.audio_data = np.mean(self.audio_data, axis=1)  # Convert to mono
-        
-        # Normalize waveform
-        self.audio_data = self.audio_data / np.max(np.abs(self.audio_data))
-        self.num_samples = len(self.audio_data)
-        self.max_amplitude = np.max(np.abs(self.audio_data))
+        # Read the file before touching it, so input that cannot be loaded
+        # stays where the user put it
+        self.sample_rate, self.audio_data = _read_wav(audio_file)
+        mapped = isinstance(self.audio_data, np.memmap)
+        if mapped:
+            # A mapped file cannot be moved on every platform; release it
+            # and map it again at its new location below
+            self.audio_data = None
 
         # Extract filename without extension
         self.base_name = os.path.splitext(os.path.basename(audio_file))[0]
@@ -27,20 +94,63 @@ class IntegratedWaveformTool:
         os.makedirs(self.output_folder, exist_ok=True)
 
         # Move the original audio file to the new folder
-        shutil.move(self.audio_file, os.path.join(self.output_folder, os.path.basename(self.audio_file)))
+        moved_file = os.path.join(self.output_folder, os.path.basename(self.audio_file))
+        shutil.move(self.audio_file, moved_file)
+
+        if mapped:
+            # Pages are only read in as they are touched
+            self.sample_rate, self.audio_data = wavfile.read(moved_file, mmap=True)
+        self._raw_int16 = None
+
+        if self.audio_data.dtype == np.int16 and self.audio_data.ndim == 1:
+            # Mono 16-bit PCM: only the sign of each sample is used, so keep
+            # the raw (copy-on-write mapped) samples and skip normalization entirely
+            self._raw_int16 = self.audio_data
+            self._pos_mask = self._raw_int16 > 0
+            self._zero_mask = self._raw_int16 == 0
+        else:
+            # Convert stereo to mono if needed (float32 is plenty for 16-bit output);
+            # this also copies the samples out of the copy-on-write mapping
+            if len(self.audio_data.shape) == 2:  # If stereo (2D array)
+                self.audio_data = self.audio_data.mean(axis=1, dtype=np.float32)  # Convert to mono
+            else:
+                self.audio_data = self.audio_data.astype(np.float32)
+
+            # Normalize waveform
+            self.audio_data /= np.abs(self.audio_data).max()
+            # Sample signs pick the envelope per sample; they never change
+            self._pos_mask = self.audio_data > 0
+            self._zero_mask = self.audio_data == 0
+        self.num_samples = len(self.audio_data)
+        # Blend and PCM output buffers, allocated on the first save and
+        # reused by any later one
+        self._blend_buf = None
+        self._pcm16_buf = None
+        self._x_axis = np.arange(self.num_samples, dtype=np.int32)  # reused by every line update
+        self.max_amplitude = 1.0  # the drawing is always in normalized units
         
         # Set up the plot
         self.fig, self.ax = plt.subplots()
-        self.line_pos, = self.ax.plot([], [], color='blue')
-        self.line_neg, = self.ax.plot([], [], color='red')
+        # Animated lines are left out of full canvas draws; they are blitted
+        # on top of the background cached in on_draw
+        self.line_pos, = self.ax.plot([], [], color='blue', animated=True)
+        self.line_neg, = self.ax.plot([], [], color='red', animated=True)
+        self.background = None
+        # Motion events arrive far faster than the screen refreshes; the
+        # arrays take every event, but the lines are blitted at most ~60 Hz
+        self._last_blit = 0.0
+        self.cid_draw = self.fig.canvas.mpl_connect('draw_event', self.on_draw)
         self.cid_click = self.fig.canvas.mpl_connect('button_press_event', self.on_click)
         self.cid_motion = self.fig.canvas.mpl_connect('motion_notify_event', self.on_hover)
         self.cid_release = self.fig.canvas.mpl_connect('button_release_event', self.on_release)
         self.ax.set_ylim(-self.max_amplitude, self.max_amplitude)
         self.ax.set_xlim(0, self.num_samples)
         self.is_drawing = False
-        self.drawing_pos = np.zeros(self.num_samples)
-        self.drawing_neg = np.zeros(self.num_samples)
+        self.drawing_pos = np.zeros(self.num_samples, dtype=np.float32)
+        self.drawing_neg = np.zeros(self.num_samples, dtype=np.float32)
+        # x never changes, so update_drawing only has to swap the y data
+        self.line_pos.set_data(self._x_axis, self.drawing_pos)
+        self.line_neg.set_data(self._x_axis, self.drawing_neg)
         self.prev_idx = None  
 
     def on_click(self, event):
@@ -57,65 +167,123 @@ class IntegratedWaveformTool:
     def on_release(self, event):
         self.is_drawing = False
         self.prev_idx = None
+        # Show the end of the stroke even if its last events were throttled
+        self._blit_lines()
+
+    def on_draw(self, event):
+        # Full redraw (first show, resize, ...): cache the clean background
+        # and paint the envelope lines on top of it
+        self.background = event.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line_pos)
+        self.ax.draw_artist(self.line_neg)
+
+    def _blit_lines(self):
+        canvas = self.fig.canvas
+        if self.background is None:
+            # Nothing cached yet; the full draw paints the lines in on_draw
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)
+        self.ax.draw_artist(self.line_pos)
+        self.ax.draw_artist(self.line_neg)
+        canvas.blit(self.ax.bbox)
 
     def update_drawing(self, event):
         idx = int(event.xdata)
         if 0 <= idx < len(self.drawing_pos):
             if event.ydata > 0:
                 if self.prev_idx is not None:
-                    self.drawing_pos[self.prev_idx:idx + 1] = np.linspace(self.drawing_pos[self.prev_idx], event.ydata, idx - self.prev_idx + 1)
+                    _fill_segment(self.drawing_pos, self._x_axis, self.prev_idx, idx, event.ydata)
                 self.drawing_pos[idx] = event.ydata
-                self.line_pos.set_data(np.arange(len(self.drawing_pos)), self.drawing_pos)
+                self.line_pos.set_ydata(self.drawing_pos)
             elif event.ydata < 0:
                 if self.prev_idx is not None:
-                    self.drawing_neg[self.prev_idx:idx + 1] = np.linspace(self.drawing_neg[self.prev_idx], event.ydata, idx - self.prev_idx + 1)
+                    _fill_segment(self.drawing_neg, self._x_axis, self.prev_idx, idx, event.ydata)
                 self.drawing_neg[idx] = event.ydata
-                self.line_neg.set_data(np.arange(len(self.drawing_neg)), self.drawing_neg)
+                self.line_neg.set_ydata(self.drawing_neg)
             self.prev_idx = idx
-            self.fig.canvas.draw()
+            now = time.monotonic()
+            if now - self._last_blit >= 1 / 60:
+                self._last_blit = now
+                self._blit_lines()
 
     def save_drawing(self):
         output_png = os.path.join(self.output_folder, f"future_{self.base_name}.png")
+        # Drawing is over: render the lines normally so savefig includes them
+        self.fig.canvas.mpl_disconnect(self.cid_draw)
+        self.line_pos.set_animated(False)
+        self.line_neg.set_animated(False)
         self.fig.savefig(output_png)
         print(f"Saved drawing as {output_png}")
 
     def save_to_csv(self):
         output_csv = os.path.join(self.output_folder, f"future_{self.base_name}.csv")
-        with open(output_csv, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(['Index', 'Positive Amplitude', 'Negative Amplitude'])
-            for i in range(self.num_samples):
-                writer.writerow([i, self.drawing_pos[i], self.drawing_neg[i]])
+        np.savetxt(output_csv,
+                   np.column_stack([self._x_axis, self.drawing_pos, self.drawing_neg]),
+                   delimiter=',', header='Index,Positive Amplitude,Negative Amplitude',
+                   fmt=('%d', '%.8g', '%.8g'), comments='')
         print(f"Saved CSV as {output_csv}")
 
-    def apply_drawing_to_waveform(self):
-        self.save_to_csv()
-        adjusted_audio_data = np.zeros_like(self.audio_data)
+    def save_outputs(self):
+        # The CSV and WAV writes only touch numpy data, so they run on worker
+        # threads while the Matplotlib work stays on the main thread.
+        self.adjusted_audio_data = self._build_adjusted()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            csv_future = executor.submit(self.save_to_csv)
+            wav_future = executor.submit(self._write_wav_only)
+            self.save_drawing()
+            csv_future.result()
+            wav_future.result()
+        self._plot_comparison()
 
-        for i in range(len(self.audio_data)):
-            if self.audio_data[i] > 0:
-                adjusted_audio_data[i] = self.drawing_pos[i]
-            elif self.audio_data[i] < 0:
-                adjusted_audio_data[i] = self.drawing_neg[i]
-            else:
-                adjusted_audio_data[i] = self.audio_data[i]
+    def _build_adjusted(self):
+        # Same blend for float and int16 input; only the cached sign masks
+        # come from the raw samples in the int16 case
+        if self._blend_buf is None:
+            self._blend_buf = np.empty(self.num_samples, dtype=np.float32)
+        _blend(self._pos_mask, self._zero_mask, self.drawing_pos, self.drawing_neg,
+               self._blend_buf)
+        return self._blend_buf
 
+    def _write_wav_only(self):
         # Create output WAV filename inside new folder
         output_wav = os.path.join(self.output_folder, f"future_{self.base_name}.wav")
         
-        # Save modified waveform
-        wavfile.write(output_wav, self.sample_rate, (adjusted_audio_data * 32767).astype(np.int16))
+        # Save modified waveform. _to_int16 clips the blend buffer in place,
+        # so the comparison plot shows exactly the samples that were written
+        if self._pcm16_buf is None:
+            self._pcm16_buf = np.empty(self.num_samples, dtype=np.int16)
+        wavfile.write(output_wav, self.sample_rate,
+                      _to_int16(self.adjusted_audio_data, out=self._pcm16_buf))
         print(f"Saved adjusted audio as {output_wav}")
 
+    def _plot_band(self, ax, y, width_px, color, scale=1.0):
+        # Long signals are drawn as a per-pixel min/max band; short ones
+        # have fewer samples than pixels and are plotted as-is.
+        if len(y) > 2 * width_px:
+            ax.add_collection(_envelope_lc(y, width_px, scale, colors=color))
+            ax.autoscale_view()
+        else:
+            ax.plot(y * scale, color=color)
+
+    def _plot_comparison(self):
         # Plot original vs adjusted waveform
-        plt.figure(figsize=(10, 6))
+        fig = plt.figure(figsize=(10, 6))
+        width_px = int(fig.get_figwidth() * fig.dpi)
+
+        # The int16 fast path keeps the raw PCM samples; show them
+        # peak-normalized like the float path
+        orig_scale = 1.0
+        if self._raw_int16 is not None:
+            peak = max(int(self._raw_int16.max()), -int(self._raw_int16.min()), 1)
+            orig_scale = 1.0 / peak
         
-        plt.subplot(2, 1, 1)
-        plt.plot(self.audio_data, color='blue')
+        ax = plt.subplot(2, 1, 1)
+        self._plot_band(ax, self.audio_data, width_px, 'blue', orig_scale)
         plt.title('Original Audio Waveform')
         
-        plt.subplot(2, 1, 2)
-        plt.plot(adjusted_audio_data, color='green')
+        ax = plt.subplot(2, 1, 2)
+        self._plot_band(ax, self.adjusted_audio_data, width_px, 'green')
         plt.title('Adjusted Audio Waveform')
         
         plt.tight_layout()
@@ -131,5 +299,4 @@ waveform_tool = IntegratedWaveformTool(audio_file)
 plt.show()
 
 # After closing the plot, save outputs
-waveform_tool.save_drawing()
-waveform_tool.apply_drawing_to_waveform()
+waveform_tool.save_outputs()
@@ -14,6 +14,7 @@ class SimpleDrawTool:
         self.is_drawing = False
         self.drawing = np.zeros(1000)  # Blank canvas for drawing
         self.prev_idx = None  # To store the previous index for continuous line
+        self._x_axis = np.arange(len(self.drawing), dtype=np.int32)  # Shared x values, reused by every update
         plt.show()
 
     def on_click(self, event):
@@ -39,7 +40,7 @@ class SimpleDrawTool:
                 self.drawing[self.prev_idx:idx + 1] = np.linspace(self.drawing[self.prev_idx], event.ydata, idx - self.prev_idx + 1)
             self.drawing[idx] = event.ydata
             self.prev_idx = idx
-            self.line.set_data(np.arange(len(self.drawing)), self.drawing)
+            self.line.set_data(self._x_axis, self.drawing)
             self.fig.canvas.draw()
 
 # Example usage
@@ -16,6 +16,7 @@ class SimpleDrawTool:
         self.drawing_pos = np.zeros(1000)  # Blank canvas for positive area
         self.drawing_neg = np.zeros(1000)  # Blank canvas for negative area
         self.prev_idx = None  # To store the previous index for continuous line
+        self._x_axis = np.arange(len(self.drawing_pos), dtype=np.int32)  # Shared x values, reused by every update
         plt.show()
 
     def on_click(self, event):
@@ -41,13 +42,13 @@ class SimpleDrawTool:
                     # Create a continuous line between the previous point and the current point
                     self.drawing_pos[self.prev_idx:idx + 1] = np.linspace(self.drawing_pos[self.prev_idx], event.ydata, idx - self.prev_idx + 1)
                 self.drawing_pos[idx] = event.ydata
-                self.line_pos.set_data(np.arange(len(self.drawing_pos)), self.drawing_pos)
+                self.line_pos.set_data(self._x_axis, self.drawing_pos)
             elif event.ydata < 0:
                 if self.prev_idx is not None:
                     # Create a continuous line between the previous point and the current point
                     self.drawing_neg[self.prev_idx:idx + 1] = np.linspace(self.drawing_neg[self.prev_idx], event.ydata, idx - self.prev_idx + 1)
                 self.drawing_neg[idx] = event.ydata
-                self.line_neg.set_data(np.arange(len(self.drawing_neg)), self.drawing_neg)
+                self.line_neg.set_data(self._x_axis, self.drawing_neg)
             self.prev_idx = idx
             self.fig.canvas.draw()
 
@@ -1,15 +1,19 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.io import wavfile
-import csv
 
 class SimpleDrawTool:
     def __init__(self, audio_file):
         # Read the audio file
         self.sample_rate, self.audio_data = wavfile.read(audio_file)
-        self.audio_data = self.audio_data / np.max(np.abs(self.audio_data))
+        # Downmix/convert into one float32 buffer, then normalize it in place
+        if self.audio_data.ndim > 1:
+            self.audio_data = self.audio_data.mean(axis=1, dtype=np.float32)
+        else:
+            self.audio_data = self.audio_data.astype(np.float32)
+        self.audio_data /= np.abs(self.audio_data).max()
         self.num_samples = len(self.audio_data)
-        self.max_amplitude = np.max(np.abs(self.audio_data))
+        self.max_amplitude = 1.0  # peak-normalized above
         
         # Set up the plot
         self.fig, self.ax = plt.subplots()
@@ -21,9 +25,10 @@ class SimpleDrawTool:
         self.ax.set_ylim(-self.max_amplitude, self.max_amplitude)
         self.ax.set_xlim(0, self.num_samples)  # x-axis range based on number of samples
         self.is_drawing = False
-        self.drawing_pos = np.zeros(self.num_samples)  # Blank canvas for positive area
-        self.drawing_neg = np.zeros(self.num_samples)  # Blank canvas for negative area
+        self.drawing_pos = np.zeros(self.num_samples, dtype=np.float32)  # Blank canvas for positive area
+        self.drawing_neg = np.zeros(self.num_samples, dtype=np.float32)  # Blank canvas for negative area
         self.prev_idx = None  # To store the previous index for continuous line
+        self._x_axis = np.arange(len(self.drawing_pos), dtype=np.int32)  # Shared x values, reused by every update
 
     def on_click(self, event):
         if event.inaxes != self.ax:
@@ -48,13 +53,13 @@ class SimpleDrawTool:
                     # Create a continuous line between the previous point and the current point
                     self.drawing_pos[self.prev_idx:idx + 1] = np.linspace(self.drawing_pos[self.prev_idx], event.ydata, idx - self.prev_idx + 1)
                 self.drawing_pos[idx] = event.ydata
-                self.line_pos.set_data(np.arange(len(self.drawing_pos)), self.drawing_pos)
+                self.line_pos.set_data(self._x_axis, self.drawing_pos)
             elif event.ydata < 0:
                 if self.prev_idx is not None:
                     # Create a continuous line between the previous point and the current point
                     self.drawing_neg[self.prev_idx:idx + 1] = np.linspace(self.drawing_neg[self.prev_idx], event.ydata, idx - self.prev_idx + 1)
                 self.drawing_neg[idx] = event.ydata
-                self.line_neg.set_data(np.arange(len(self.drawing_neg)), self.drawing_neg)
+                self.line_neg.set_data(self._x_axis, self.drawing_neg)
             self.prev_idx = idx
             self.fig.canvas.draw()
 
@@ -62,11 +67,11 @@ class SimpleDrawTool:
         self.fig.savefig(output_file)
 
     def save_to_csv(self, csv_file):
-        with open(csv_file, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(['Index', 'Positive Amplitude', 'Negative Amplitude'])
-            for i in range(self.num_samples):
-                writer.writerow([i, self.drawing_pos[i], self.drawing_neg[i]])
+        # One vectorized write instead of a Python writerow call per sample
+        np.savetxt(csv_file,
+                   np.column_stack([self._x_axis, self.drawing_pos, self.drawing_neg]),
+                   delimiter=',', header='Index,Positive Amplitude,Negative Amplitude',
+                   fmt=('%d', '%.8g', '%.8g'), comments='')
 
 # Example usage
 draw_tool = SimpleDrawTool('input.wav')